@@ -1,30 +1,293 @@
 """
 AI 예측 모듈
-- LinearRegression 기반 토양 수분 예측
+- RandomForest 기반 토양 수분 예측
 - 특성 엔지니어링
 - 모델 학습 및 평가
 """
 
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-import pickle
 import os
 
 
+def _infer_lag(timestamps):
+    """
+    데이터 간격으로 1시간에 해당하는 행 수 계산
+    
+    Returns:
+        int: 5분 간격이면 12, 1시간 간격이면 1
+    """
+    if len(timestamps) > 1:
+        time_diff = (pd.Timestamp(timestamps.iloc[1]) - pd.Timestamp(timestamps.iloc[0])).total_seconds()
+        if time_diff < 600:
+            return 12  # 5분 간격
+    return 1  # 1시간 간격
+
+
+def _window_features(window, head, lag, temperature, humidity, hour):
+    """
+    링 버퍼에 담긴 최근 6시간 수분 값으로 가장 최근 시점의 특성 벡터 생성
+    
+    Args:
+        window: 토양 수분 링 버퍼 (길이 lag * 6)
+        head: 다음에 덮어쓸 위치 (가장 오래된 값의 위치)
+        lag: 1시간에 해당하는 행 수
+        temperature, humidity, hour: 가장 최근 시점의 값
+        
+    Returns:
+        np.ndarray: feature_columns 순서의 특성 벡터
+    """
+    size = len(window)
+    moisture = window[(head - 1) % size]
+    moisture_1h = window[(head - 1 - lag) % size]
+    moisture_2h = window[(head - 1 - lag * 2) % size]
+    moisture_3h = window[(head - 1 - lag * 3) % size]
+    
+    return np.array([
+        moisture, moisture_1h, moisture_2h, moisture_3h,
+        moisture - moisture_1h,
+        moisture - moisture_3h,
+        window.mean(),
+        window.std(ddof=1),
+        temperature,
+        humidity,
+        hour,
+        6 <= hour <= 18
+    ], dtype=np.float64)
+
+
+def _feature_matrix(moisture, temperature, humidity, hour, lag):
+    """
+    과거 6시간 데이터가 모두 있는 시점(lag * 6 - 1번째 행부터)의 특성 행렬 생성
+    
+    shift()로 NaN을 채운 뒤 dropna()로 버리는 대신 유효 구간만 바로 슬라이싱
+    
+    Args:
+        moisture, temperature, humidity, hour: 시간순 1차원 배열
+        lag: 1시간에 해당하는 행 수
+        
+    Returns:
+        np.ndarray: feature_columns 순서의 float32 특성 행렬
+    """
+    n = len(moisture)
+    size = lag * 6
+    start = size - 1
+    
+    current = moisture[start:]
+    moisture_1h = moisture[start - lag:n - lag]
+    moisture_2h = moisture[start - lag * 2:n - lag * 2]
+    moisture_3h = moisture[start - lag * 3:n - lag * 3]
+    
+    # 롤링 통계 (6시간) - 누적합 차이로 구간 합 계산
+    csum = np.concatenate(([0.0], np.cumsum(moisture)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(moisture ** 2)))
+    window_sum = csum[size:] - csum[:-size]
+    window_sum_sq = csum_sq[size:] - csum_sq[:-size]
+    rolling_mean = window_sum / size
+    rolling_std = np.sqrt(np.maximum(window_sum_sq - window_sum * rolling_mean, 0) / (size - 1))
+    
+    hour = hour[start:]
+    
+    # 트리 모델이 내부적으로 쓰는 float32 행렬에 바로 채움 (학습/예측 시 변환 복사 없음)
+    columns = [
+        current, moisture_1h, moisture_2h, moisture_3h,
+        current - moisture_1h,
+        current - moisture_3h,
+        rolling_mean,
+        rolling_std,
+        temperature[start:],
+        humidity[start:],
+        hour,
+        (hour >= 6) & (hour <= 18)
+    ]
+    X = np.empty((len(current), len(columns)), dtype=np.float32)
+    for i, column in enumerate(columns):
+        X[:, i] = column
+    
+    return X
+
+
+def _make_forest(n_jobs=-1):
+    """토양 수분 예측용 RandomForest 생성"""
+    from sklearn.ensemble import RandomForestRegressor
+    
+    return RandomForestRegressor(
+        n_estimators=100, 
+        max_depth=10, 
+        random_state=42,
+        n_jobs=n_jobs  # 병렬 처리
+    )
+
+
+def _evaluate(y_true, y_pred):
+    """평가 지표 (R², RMSE, MAE) 계산"""
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+    
+    return {
+        'r2': r2_score(y_true, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
+        'mae': mean_absolute_error(y_true, y_pred)
+    }
+
+
+def _fit_one_fold(X, y, train_idx, test_idx):
+    """교차 검증 fold 1개 학습 및 평가 (병렬 작업 단위)"""
+    # fold끼리 이미 병렬로 돌기 때문에 fold 안에서는 단일 스레드로 학습
+    model = _make_forest(n_jobs=1)
+    model.fit(X[train_idx], y[train_idx])
+    return _evaluate(y[test_idx], model.predict(X[test_idx]))
+
+
+class ForestArrays:
+    """
+    RandomForest의 트리들을 NumPy 배열로 펼친 추론 전용 모델
+    
+    np.savez 파일로 저장/로드하며, 예측할 때 sklearn이 필요 없다.
+    """
+    
+    def __init__(self, left, right, feature, threshold, value, roots, max_depth):
+        """
+        Args:
+            left, right: 자식 노드 인덱스 (리프는 -1)
+            feature, threshold: 분기 특성 인덱스와 기준값
+            value: 노드 예측값
+            roots: 각 트리의 루트 노드 인덱스
+            max_depth: 가장 깊은 트리의 깊이
+        """
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+    
+    @classmethod
+    def from_forest(cls, forest):
+        """학습된 RandomForestRegressor를 배열로 변환"""
+        trees = [est.tree_ for est in forest.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+        
+        # 트리별 노드 번호에 오프셋을 더해 하나의 배열로 연결
+        left = np.concatenate([np.where(t.children_left < 0, -1, t.children_left + off)
+                               for t, off in zip(trees, offsets)])
+        right = np.concatenate([np.where(t.children_right < 0, -1, t.children_right + off)
+                                for t, off in zip(trees, offsets)])
+        
+        return cls(
+            left=left.astype(np.int32),
+            right=right.astype(np.int32),
+            feature=np.concatenate([t.feature for t in trees]).astype(np.int32),
+            threshold=np.concatenate([t.threshold for t in trees]),
+            value=np.concatenate([t.value[:, 0, 0] for t in trees]),
+            roots=offsets.astype(np.int32),
+            max_depth=max(t.max_depth for t in trees)
+        )
+    
+    @classmethod
+    def load(cls, path):
+        """np.savez 파일에서 로드"""
+        with np.load(path) as data:
+            return cls(**{key: data[key] for key in data.files})
+    
+    def save(self, path):
+        """np.savez 파일로 저장"""
+        with open(path, 'wb') as f:
+            np.savez(f, left=self.left, right=self.right, feature=self.feature,
+                     threshold=self.threshold, value=self.value,
+                     roots=self.roots, max_depth=self.max_depth)
+    
+    def append(self, other, max_trees=None):
+        """
+        다른 ForestArrays의 트리를 뒤에 붙인 새 모델 반환
+        
+        Args:
+            other: 추가할 ForestArrays
+            max_trees: 유지할 최대 트리 수 (넘으면 앞쪽의 오래된 트리부터 제거)
+        """
+        offset = len(self.value)
+        left = np.concatenate([self.left, np.where(other.left < 0, -1, other.left + offset)])
+        right = np.concatenate([self.right, np.where(other.right < 0, -1, other.right + offset)])
+        feature = np.concatenate([self.feature, other.feature])
+        threshold = np.concatenate([self.threshold, other.threshold])
+        value = np.concatenate([self.value, other.value])
+        roots = np.concatenate([self.roots, other.roots + offset])
+        
+        if max_trees is not None and len(roots) > max_trees:
+            # 트리별 노드는 연속 구간이므로 남길 첫 트리의 루트부터 잘라내고 번호를 당김
+            start = roots[-max_trees]
+            left = np.where(left[start:] < 0, -1, left[start:] - start)
+            right = np.where(right[start:] < 0, -1, right[start:] - start)
+            feature, threshold, value = feature[start:], threshold[start:], value[start:]
+            roots = roots[-max_trees:] - start
+        
+        return ForestArrays(
+            left=left.astype(np.int32),
+            right=right.astype(np.int32),
+            feature=feature,
+            threshold=threshold,
+            value=value,
+            roots=roots.astype(np.int32),
+            max_depth=max(self.max_depth, other.max_depth)
+        )
+    
+    def predict(self, X):
+        """
+        모든 트리를 동시에 따라 내려가며 예측
+        
+        Args:
+            X: (샘플 수, 특성 수) 배열
+            
+        Returns:
+            np.ndarray: 트리 예측값 평균
+        """
+        X = np.asarray(X, dtype=np.float32)  # sklearn 트리와 같은 정밀도로 비교
+        rows = np.arange(len(X))[:, np.newaxis]
+        nodes = np.repeat(self.roots[np.newaxis, :], len(X), axis=0)
+        
+        for _ in range(self.max_depth):
+            left = self.left[nodes]
+            is_split = left >= 0
+            if not is_split.any():
+                break
+            
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(is_split, np.where(go_left, left, self.right[nodes]), nodes)
+        
+        return self.value[nodes].mean(axis=1)
+
+
+# 급수 긴급도별 안내 메시지 (일괄 추천용)
+_URGENCY_MESSAGES = {
+    'high': "⚠️ 긴급! 예측 수분이 매우 낮습니다. 즉시 급수하세요.",
+    'medium': "💧 주의: 예측 수분이 낮습니다. 급수를 권장합니다.",
+    'low': "💡 알림: 예측 수분이 임계값에 근접합니다. 급수를 고려하세요.",
+    'none': "✅ 양호: 예측 수분이 충분합니다."
+}
+
+
 class SoilMoisturePredictor:
     """토양 수분 예측 AI 모델"""
     
-    def __init__(self, model_path='soil_model.pkl'):
+    def __init__(self, model_path='soil_model.npz'):
         """
         Args:
             model_path: 학습된 모델 저장 경로
         """
         self.model_path = model_path
         self.model = None
+        self._forest = None  # 추론용 배열 모델 (ForestArrays)
+        
+        # 최근 특성 캐시 (새 데이터 1개가 추가되면 전체 재계산 없이 갱신)
+        self._feat_cache = None  # 가장 최근 시점의 특성 벡터
+        self._last_ts = None     # 캐시된 가장 최근 타임스탬프
+        self._window = None      # 최근 6시간 토양 수분 링 버퍼
+        self._head = 0
+        self._lag = 1
+        self._pred_cache = None  # (최신 타임스탬프, 추론 모델, 예측값) - 특성 캐시가 바뀌면 비움
+        
+        # 예측에 필요한 최근 데이터 행 수 (5분 간격 기준 6시간)
+        self.lookback = 12 * 6
         self.feature_columns = [
             'soil_moisture',      # 현재 수분
             'soil_moisture_1h',   # 1시간 전 수분
@@ -44,97 +307,94 @@ class SoilMoisturePredictor:
         if os.path.exists(model_path):
             self.load_model()
     
+    @property
+    def inference_model(self):
+        """
+        예측에 쓰이는 추론 모델 (읽기 전용)
+        
+        학습/추가 학습/로드마다 새 객체로 바뀌므로 예측 결과 캐시의 키로 쓸 수 있다.
+        """
+        return self._forest
+    
     def create_features(self, df):
         """
         향상된 특성 엔지니어링
-        """
-        df = df.copy()
-        
-        if df['timestamp'].dtype == 'object':
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
         
-        # 시간 특성
-        df['hour'] = df['timestamp'].dt.hour
-        df['is_daytime'] = ((df['hour'] >= 6) & (df['hour'] <= 18)).astype(int)
+        Returns:
+            tuple: (X, y) 특성 행렬과 1시간 후 토양 수분 배열, 데이터 부족 시 (None, None)
+        """
+        # 입력 DataFrame은 복사/수정하지 않고 필요한 컬럼만 배열로 읽음
+        timestamps = df['timestamp']
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, format='%Y-%m-%d %H:%M:%S')
         
         # 데이터 간격 확인
-        if len(df) > 1:
-            time_diff = (df['timestamp'].iloc[1] - df['timestamp'].iloc[0]).total_seconds()
-            if time_diff < 600:
-                lag = 12  # 5분 간격
-            else:
-                lag = 1   # 1시간 간격
-        else:
-            lag = 1
-        
-        # Lag 특성 (과거 데이터)
-        df['soil_moisture_1h'] = df['soil_moisture'].shift(lag)
-        df['soil_moisture_2h'] = df['soil_moisture'].shift(lag * 2)
-        df['soil_moisture_3h'] = df['soil_moisture'].shift(lag * 3)
-        
-        # 변화율 특성
-        df['moisture_change'] = df['soil_moisture'] - df['soil_moisture_1h']
-        df['moisture_change_3h'] = df['soil_moisture'] - df['soil_moisture_3h']
-        
-        # 롤링 통계 (6시간)
-        df['moisture_rolling_mean'] = df['soil_moisture'].rolling(lag * 6).mean()
-        df['moisture_rolling_std'] = df['soil_moisture'].rolling(lag * 6).std()
-        df['moisture_rolling_std'] = df['moisture_rolling_std'].fillna(0)
+        lag = _infer_lag(timestamps)
         
-        # 타겟: 1시간 후 토양 수분
-        df['target'] = df['soil_moisture'].shift(-lag)
-        
-        # NaN 제거
-        df = df.dropna()
-        
-        if len(df) == 0:
+        # 과거 6시간 + 1시간 후 타겟이 모두 있는 행이 없으면 학습 불가
+        if len(df) < lag * 7:
             return None, None
         
-        X = df[self.feature_columns]
-        y = df['target']
+        moisture = df['soil_moisture'].to_numpy(dtype=np.float64)
+        X = _feature_matrix(
+            moisture,
+            df['temperature'].to_numpy(dtype=np.float64),
+            df['humidity'].to_numpy(dtype=np.float64),
+            timestamps.dt.hour.to_numpy(),
+            lag
+        )
+        
+        # 타겟: 1시간 후 토양 수분 (마지막 lag개 시점은 타겟이 없어 제외)
+        y = moisture[lag * 7 - 1:]
+        X = X[:len(y)]
         
         return X, y
     
-    def train(self, df, test_size=0.2):
+    def train(self, df, test_size=0.2, n_splits=None):
         """
         모델 학습
         
         Args:
             df: 학습 데이터 DataFrame
             test_size: 테스트 데이터 비율
+            n_splits: 지정하면 K-fold 교차 검증으로 평가 (fold별 학습은 병렬 실행)
+                      후 전체 데이터로 최종 모델 학습
             
         Returns:
             dict: 평가 지표 (R², RMSE, MAE)
         """
+        # sklearn은 학습할 때만 필요 (예측/모델 로드는 NumPy만 사용)
+        from sklearn.model_selection import KFold, train_test_split
+        from joblib import Parallel, delayed
+        
         X, y = self.create_features(df)
         
         if X is None or len(X) < 10:
             print("[학습] 데이터가 부족합니다. 최소 10개 이상의 데이터가 필요합니다.")
             return None
         
-        # 학습/테스트 분할
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=42
-        )
+        if n_splits:
+            # K-fold 교차 검증 - fold마다 독립적이므로 CPU 코어에 나눠서 실행
+            folds = KFold(n_splits=n_splits).split(X)
+            results = Parallel(n_jobs=-1)(
+                delayed(_fit_one_fold)(X, y, train_idx, test_idx) for train_idx, test_idx in folds
+            )
+            metrics = {key: np.mean([r[key] for r in results]) for key in results[0]}
+            X_train, y_train = X, y
+        else:
+            # 학습/테스트 분할
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=test_size, random_state=42
+            )
         
         # 모델 학습
-        self.model = RandomForestRegressor(
-            n_estimators=100, 
-            max_depth=10, 
-            random_state=42,
-            n_jobs=-1  # 병렬 처리
-
-        )
+        self.model = _make_forest()
         self.model.fit(X_train, y_train)
+        self._forest = ForestArrays.from_forest(self.model)
         
         # 예측 및 평가
-        y_pred = self.model.predict(X_test)
-        
-        metrics = {
-            'r2': r2_score(y_test, y_pred),
-            'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
-            'mae': mean_absolute_error(y_test, y_pred)
-        }
+        if not n_splits:
+            metrics = _evaluate(y_test, self.model.predict(X_test))
         
         # 모델 저장
         self.save_model()
@@ -150,6 +410,51 @@ class SoilMoisturePredictor:
         
         return metrics
     
+    def partial_train(self, df_delta, n_new_trees=10, max_trees=300):
+        """
+        새로 들어온 데이터 구간으로 추가 학습 (warm start)
+        
+        RandomForest는 partial_fit이 없으므로 새 구간으로 학습한 트리를 기존 숲에 추가하고,
+        트리 수가 max_trees를 넘으면 가장 오래된 트리부터 제거한다.
+        파일에서 불러온 배열 모델(재시작 후)은 새 트리만 학습해 배열 모델 뒤에 붙인다.
+        
+        Args:
+            df_delta: 마지막 학습 이후 데이터 (특성 계산을 위해 직전 6시간 포함)
+            n_new_trees: 추가할 트리 수
+            max_trees: 유지할 최대 트리 수
+            
+        Returns:
+            int: 추가 학습에 사용한 샘플 수, 모델이 없으면 None (train()으로 학습 필요)
+        """
+        if self.model is None:
+            return None
+        
+        X, y = self.create_features(df_delta)
+        if X is None:
+            return 0
+        
+        if hasattr(self.model, 'estimators_'):
+            n_trees = len(self.model.estimators_)
+            self.model.set_params(warm_start=True, n_estimators=n_trees + n_new_trees)
+            self.model.fit(X, y)
+            
+            # 오래된 트리 제거 (최근 데이터로 학습한 트리 위주로 유지)
+            if len(self.model.estimators_) > max_trees:
+                self.model.estimators_ = self.model.estimators_[-max_trees:]
+                self.model.set_params(n_estimators=max_trees)
+            
+            self._forest = ForestArrays.from_forest(self.model)
+        else:
+            new_trees = _make_forest().set_params(n_estimators=n_new_trees)
+            new_trees.fit(X, y)
+            self.model = self._forest = self._forest.append(
+                ForestArrays.from_forest(new_trees), max_trees)
+        
+        self.save_model()
+        print(f"[학습] 추가 학습 완료: 샘플 {len(X)}개, 트리 {len(self._forest.roots)}개")
+        
+        return len(X)
+    
     def predict_next(self, df):
         """
         1시간 후 토양 수분 예측
@@ -164,21 +469,139 @@ class SoilMoisturePredictor:
             print("[예측] 학습된 모델이 없습니다. 먼저 train()을 호출하세요.")
             return None
         
-        X, _ = self.create_features(df)
+        timestamps = df['timestamp']
+        latest_ts = pd.Timestamp(timestamps.iloc[-1])
+        
+        # 직전 호출 이후 1개만 추가됐으면 캐시 갱신, 그 외 변경은 최근 구간으로 재생성
+        if (self._feat_cache is not None and len(df) > 1
+                and pd.Timestamp(timestamps.iloc[-2]) == self._last_ts):
+            self.update_features(df.iloc[-1])
+        
+        if (self._feat_cache is None or latest_ts != self._last_ts
+                or not self._cache_matches(df)):
+            self._rebuild_features(df)
         
-        if X is None or len(X) == 0:
+        if self._feat_cache is None:
             print("[예측] 특성 생성 실패. 데이터를 확인하세요.")
             return None
         
+        # 특성 캐시가 그대로이고 모델도 같으면 이전 예측값 재사용 (대시보드 새로고침 등)
+        cache = self._pred_cache
+        if cache is not None and cache[0] == self._last_ts and cache[1] is self._forest:
+            return cache[2]
+        
         # 가장 최근 데이터로 예측
-        latest_features = X.iloc[-1:]
-        prediction = self.model.predict(latest_features)[0]
+        prediction = self._predict_fast(self._feat_cache)
         
         # 예측값 범위 제한 (0~100%)
         prediction = np.clip(prediction, 0, 100)
         
+        self._pred_cache = (self._last_ts, self._forest, prediction)
         return prediction
     
+    def predict_next_array(self, moisture, temperature, humidity, hour, lag=1):
+        """
+        NumPy 배열로 1시간 후 토양 수분 예측 (DataFrame 변환 없이)
+        
+        Args:
+            moisture: 토양 수분 1차원 배열 (시간 순, 최소 lag * 6개)
+            temperature, humidity, hour: 가장 최근 시점의 온도, 습도, 시각
+            lag: 1시간에 해당하는 행 수 (5분 간격이면 12)
+            
+        Returns:
+            float: 예측된 토양 수분 (%), 모델이나 데이터가 부족하면 None
+        """
+        if self.model is None:
+            print("[예측] 학습된 모델이 없습니다. 먼저 train()을 호출하세요.")
+            return None
+        
+        size = lag * 6
+        if len(moisture) < size:
+            return None
+        
+        # 최근 6시간 구간을 head=0인 링 버퍼로 보고 특성 생성 (슬라이스는 복사 없음)
+        window = np.asarray(moisture[-size:], dtype=np.float64)
+        feat_vec = _window_features(window, 0, lag, temperature, humidity, hour)
+        
+        return np.clip(self._predict_fast(feat_vec), 0, 100)
+    
+    def _cache_matches(self, df):
+        """특성 캐시가 df의 최근 구간(수분 6시간, 최신 온도/습도)으로 만들어졌는지 확인"""
+        size = len(self._window)
+        if len(df) < size:
+            return False
+        
+        # 링 버퍼를 시간 순으로 펼쳐 df 끝부분과 비교
+        recent = df['soil_moisture'].to_numpy(dtype=np.float64)[-size:]
+        if not np.array_equal(np.roll(self._window, -self._head), recent):
+            return False
+        
+        latest = df.iloc[-1]
+        return (self._feat_cache[self.feature_columns.index('temperature')] == latest['temperature']
+                and self._feat_cache[self.feature_columns.index('humidity')] == latest['humidity'])
+    
+    def _rebuild_features(self, df):
+        """최근 6시간 데이터로 특성 캐시를 새로 생성 (데이터 부족 시 캐시 비움)"""
+        lag = _infer_lag(df['timestamp'])
+        size = lag * 6
+        self._pred_cache = None
+        
+        if len(df) < size:
+            self._feat_cache = None
+            self._last_ts = None
+            return
+        
+        self._lag = lag
+        self._window = df['soil_moisture'].to_numpy(dtype=np.float64)[-size:].copy()
+        self._head = 0
+        
+        latest = df.iloc[-1]
+        self._last_ts = pd.Timestamp(latest['timestamp'])
+        self._feat_cache = _window_features(
+            self._window, self._head, lag,
+            latest['temperature'], latest['humidity'], self._last_ts.hour
+        )
+    
+    def update_features(self, new_row):
+        """
+        새 데이터 1개로 특성 캐시 갱신
+        
+        Args:
+            new_row: timestamp, soil_moisture, temperature, humidity를 포함한 행
+        """
+        ts = pd.Timestamp(new_row['timestamp'])
+        self._pred_cache = None
+        
+        # 캐시가 없거나 시간이 거꾸로 가면 캐시 무효화
+        if self._feat_cache is None or ts <= self._last_ts:
+            self._feat_cache = None
+            self._last_ts = None
+            return
+        
+        self._window[self._head] = new_row['soil_moisture']
+        self._head = (self._head + 1) % len(self._window)
+        
+        self._last_ts = ts
+        self._feat_cache = _window_features(
+            self._window, self._head, self._lag,
+            new_row['temperature'], new_row['humidity'], ts.hour
+        )
+    
+    def _predict_fast(self, feat_vec):
+        """
+        특성 벡터 1개에 대한 예측
+        
+        model.predict()의 입력 검증과 병렬 작업 분배를 거치지 않고
+        배열 모델로 트리 예측값을 직접 평균 (RandomForest 예측과 동일한 값)
+        
+        Args:
+            feat_vec: feature_columns 순서의 1차원 특성 벡터
+            
+        Returns:
+            float: 예측값
+        """
+        return float(self._forest.predict(np.reshape(feat_vec, (1, -1)))[0])
+    
     def predict_sequence(self, df, hours=6):
         """
         다중 시간 예측 (N시간 후까지)
@@ -190,13 +613,33 @@ class SoilMoisturePredictor:
         Returns:
             list: 시간별 예측값
         """
-        predictions = []
-        current_df = df.copy()
+        if self.model is None:
+            print("[예측] 학습된 모델이 없습니다. 먼저 train()을 호출하세요.")
+            return []
         
+        lag = _infer_lag(df['timestamp'])
+        size = lag * 6
+        self._pred_cache = None
+        
+        if len(df) < size:
+            print("[예측] 특성 생성 실패. 데이터를 확인하세요.")
+            return []
+        
+        # 최근 6시간 수분 값을 링 버퍼로 유지 (DataFrame 재생성 없이 예측값만 밀어넣음)
+        window = df['soil_moisture'].to_numpy(dtype=np.float64)[-size:].copy()
+        head = 0
+        
+        # 온도/습도는 마지막 값 유지, 시간대만 1시간씩 진행
+        latest = df.iloc[-1]
+        temperature = latest['temperature']
+        humidity = latest['humidity']
+        hour = pd.Timestamp(latest['timestamp']).hour
+        
+        predictions = []
         for i in range(hours):
-            pred = self.predict_next(current_df)
-            if pred is None:
-                break
+            features = _window_features(window, head, lag, temperature, humidity, hour)
+            pred = self._predict_fast(features)
+            pred = np.clip(pred, 0, 100)
             
             predictions.append({
                 'hour': i + 1,
@@ -204,26 +647,24 @@ class SoilMoisturePredictor:
             })
             
             # 예측값을 다음 입력으로 사용 (시뮬레이션)
-            # 실제로는 더 정교한 방법 필요
-            new_row = current_df.iloc[-1:].copy()
-            new_row['soil_moisture'] = pred
-            new_row['timestamp'] = pd.to_datetime(new_row['timestamp'].iloc[0]) + pd.Timedelta(hours=1)
-            current_df = pd.concat([current_df, new_row], ignore_index=True)
+            # 기존 방식과 같이 단계마다 1개 행만 추가하고 시각은 1시간 진행
+            window[head] = pred
+            head = (head + 1) % size
+            hour = (hour + 1) % 24
         
         return predictions
     
     def save_model(self):
-        """모델 저장"""
-        if self.model:
-            with open(self.model_path, 'wb') as f:
-                pickle.dump(self.model, f)
+        """모델 저장 (트리 배열을 np.savez 형식으로)"""
+        if self._forest is not None:
+            self._forest.save(self.model_path)
             print(f"[저장] 모델 저장 완료: {self.model_path}")
     
     def load_model(self):
         """모델 로드"""
         try:
-            with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            self.model = ForestArrays.load(self.model_path)
+            self._forest = self.model
             print(f"[로드] 모델 로드 완료: {self.model_path}")
         except Exception as e:
             print(f"[로드 오류] {e}")
@@ -265,6 +706,35 @@ class SoilMoisturePredictor:
             recommendation['message'] = f"✅ 양호: 예측 수분 {predicted_moisture:.1f}%로 충분합니다."
         
         return recommendation
+    
+    def get_watering_recommendation_batch(self, predicted_moisture, threshold=35):
+        """
+        여러 시간 예측값에 대한 급수 추천 (predict_sequence 결과 등)
+        
+        Args:
+            predicted_moisture: 시간순 예측 토양 수분 배열 (%)
+            threshold: 급수 임계값 (%)
+            
+        Returns:
+            DataFrame: hour, predicted, urgency, should_water, message 컬럼
+        """
+        predicted = np.asarray(predicted_moisture, dtype=np.float64)
+        
+        urgency = np.select(
+            [predicted < threshold - 10, predicted < threshold - 5, predicted < threshold],
+            ['high', 'medium', 'low'],
+            default='none'
+        )
+        
+        result = pd.DataFrame({
+            'hour': np.arange(1, len(predicted) + 1),
+            'predicted': predicted,
+            'urgency': urgency,
+            'should_water': predicted < threshold
+        })
+        result['message'] = result['urgency'].map(_URGENCY_MESSAGES)
+        
+        return result
 
 
 # 테스트
@@ -276,7 +746,7 @@ if __name__ == "__main__":
     df = collector.load_simulation_data(days=7)
     
     # 모델 학습
-    predictor = SoilMoisturePredictor('test_model.pkl')
+    predictor = SoilMoisturePredictor('test_model.npz')
     metrics = predictor.train(df)
     
     print(f"\n📊 모델 성능:")
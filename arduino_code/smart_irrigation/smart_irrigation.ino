@@ -30,6 +30,7 @@ DHT dht(DHT_PIN, DHT_TYPE);
 const unsigned long SENSOR_INTERVAL = 300000;  // 센서 읽기 주기 (5분 = 300000ms)
 const int SOIL_DRY = 1023;      // 토양 센서 건조 시 값 (보정 필요)
 const int SOIL_WET = 300;       // 토양 센서 습윤 시 값 (보정 필요)
+#define BINARY_PROTOCOL 0        // 1이면 9바이트 바이너리 프레임 전송 (main.py BINARY_PROTOCOL과 맞춰야 함)
 
 // ============== 변수 ==============
 unsigned long lastSensorTime = 0;
@@ -99,6 +100,17 @@ void readAndSendSensorData() {
   }
   
   // 시리얼로 데이터 전송
+#if BINARY_PROTOCOL
+  // 시작 바이트 0xAA + uint16(값 x 100) x 4 (리틀 엔디언, 음수 없음)
+  uint16_t frame[4] = {
+    (uint16_t)(soilUpper * 100),
+    (uint16_t)(soilLower * 100),
+    (uint16_t)(temperature * 100),
+    (uint16_t)(humidity * 100)
+  };
+  Serial.write(0xAA);
+  Serial.write((const uint8_t*)frame, sizeof(frame));
+#else
   Serial.print("SOIL_UP:");
   Serial.print(soilUpper, 1);
   Serial.print(",SOIL_LOW:");
@@ -107,6 +119,7 @@ void readAndSendSensorData() {
   Serial.print(temperature, 1);
   Serial.print(",HUMID:");
   Serial.println(humidity, 1);
+#endif
 }
 
 // 시리얼 명령 확인
@@ -9,74 +9,283 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
+from numba import njit
+
+
+@njit(cache=True)
+def _simulate_moisture(temperature, weather, hour_of_day, rng_noise, rng_rain,
+                       rng_water, rng_drain, rng_upper_offset, rng_lower_offset):
+    """
+    토양 수분 상태 변화 순차 계산 (Numba JIT)
+    
+    난수는 모두 호출 전에 배열로 생성해서 전달 (nopython 모드 유지)
+    
+    Returns:
+        tuple: (soil_moisture, soil_upper, soil_lower, watered) 배열
+               watered는 인공 급수가 일어난 시점 여부
+    """
+    hours = temperature.shape[0]
+    soil_moisture_arr = np.empty(hours)
+    watered = np.zeros(hours, dtype=np.bool_)
+    soil_upper = np.empty(hours)
+    soil_lower = np.empty(hours)
+    
+    # 초기값
+    soil_moisture = 55.0  # 초기 토양 수분 (%)
+    last_watering = 0     # 마지막 급수 시점
+    
+    for i in range(hours):
+        current_weather = weather[i]
+        
+        # 증발률: 온도 높음, 습도 낮음, 맑음 -> 높음
+        if current_weather == 0: # 맑음
+            evaporation = 0.4 + 0.1 * (temperature[i] - 20) / 10
+            if 10 <= hour_of_day[i] <= 16: evaporation *= 1.8 # 낮 시간 가속
+        elif current_weather == 1: # 흐림
+            evaporation = 0.1 + 0.05 * (temperature[i] - 20) / 10
+        else: # 비
+            evaporation = -0.5 # 오히려 습기 참 (빗물)
+        
+        # 토양 수분 변화
+        if current_weather == 2: # 비 오는 중
+            soil_moisture += rng_rain[i] # 자연 급수
+        else:
+            soil_moisture -= evaporation + rng_noise[i]
+        
+        # 인공 급수 시뮬레이션 (수분이 25% 이하로 떨어지면 급수)
+        # 비가 오지 않을 때만
+        if soil_moisture < 25 and current_weather != 2:
+            soil_moisture += rng_water[i]  # 급수로 대폭 상승
+            last_watering = i
+            watered[i] = True
+        
+        # 급수/비 직후 수분 서서히 분산 (drainage)
+        if soil_moisture > 80:
+            soil_moisture -= 2 + 2 * rng_drain[i] # 배수 빠름 (2~4)
+        elif i - last_watering < 3 and current_weather != 2:
+            soil_moisture -= 1 + rng_drain[i]     # 1~2
+        
+        soil_moisture = min(max(soil_moisture, 10.0), 95.0)
+        soil_moisture_arr[i] = soil_moisture
+        
+        # 상단/하단 센서 차이 (비 올때는 상단이 훨씬 높음)
+        if current_weather == 2:
+            soil_upper[i] = soil_moisture + 2 + 3 * rng_upper_offset[i]  # +2~5
+            soil_lower[i] = soil_moisture - 1 - 2 * rng_lower_offset[i]  # -1~3
+        else:
+            soil_upper[i] = soil_moisture - 1 - 3 * rng_upper_offset[i]  # 상단이 더 빨리 마름 (-1~4)
+            soil_lower[i] = soil_moisture + 2 * rng_lower_offset[i]      # +0~2
+    
+    return soil_moisture_arr, soil_upper, soil_lower, watered
+
+
+# 센서 데이터 컬럼 (타임스탬프 제외)
+SENSOR_COLUMNS = ('soil_upper', 'soil_lower', 'soil_moisture', 'temperature', 'humidity')
+INITIAL_CAPACITY = 1024  # 버퍼 초기 크기 (가득 차면 2배씩 확장)
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'  # CSV 타임스탬프 형식
+
+# 시간대(0~23시)별 일교차 곡선 (입력이 24가지뿐이라 미리 계산)
+_HOURLY_SIN = np.sin((np.arange(24) - 4) * np.pi / 12)
+
 
 class DataCollector:
     """센서 데이터 수집 및 관리 클래스"""
     
-    def __init__(self, csv_path='sensor_data.csv'):
+    def __init__(self, csv_path='sensor_data.csv', max_rows=None):
         """
         Args:
             csv_path: CSV 파일 저장 경로
+            max_rows: 메모리 버퍼에 유지할 최대 데이터 개수 (None이면 제한 없음)
+                      가득 차면 오래된 절반을 CSV에 기록한 뒤 버림
         """
         self.csv_path = csv_path
-        self.data_buffer = []
+        self.max_rows = max_rows
+        
+        # 컬럼별 NumPy 배열 버퍼 (Struct-of-Arrays)
+        self.version = 0  # 버퍼 내용이 바뀔 때마다 1씩 증가
+        self._overwrite_csv = False  # 다음 저장 때 기존 파일을 덮어쓸지 여부
+        self._reset()
         
         # 기존 데이터 로드
         if os.path.exists(csv_path):
             self.load_from_csv()
     
+    def _reset(self):
+        """
+        버퍼 비우기
+        
+        get_dataframe()이 반환한 DataFrame은 버퍼 배열을 그대로 참조하므로
+        기존 배열을 덮어쓰지 않고 새 배열을 할당한다.
+        """
+        self._cap = INITIAL_CAPACITY
+        self._n = 0
+        self._persisted_n = 0  # 버퍼 앞쪽에서 CSV 파일에 이미 기록된 행 수
+        self._ts = np.empty(self._cap, dtype='datetime64[s]')
+        self._cols = {col: np.empty(self._cap, dtype=np.float32) for col in SENSOR_COLUMNS}
+    
+    def __len__(self):
+        """버퍼에 저장된 데이터 개수"""
+        return self._n
+    
+    def _reserve(self, size):
+        """버퍼 용량이 size 이상이 되도록 확장"""
+        if size <= self._cap:
+            return
+        
+        while self._cap < size:
+            self._cap *= 2
+        
+        self._ts = np.resize(self._ts, self._cap)
+        for col in SENSOR_COLUMNS:
+            self._cols[col] = np.resize(self._cols[col], self._cap)
+    
+    def _extend(self, timestamps, columns):
+        """
+        여러 개의 데이터를 한 번에 버퍼 끝에 추가
+        
+        Args:
+            timestamps: datetime64 배열
+            columns: SENSOR_COLUMNS를 키로 하는 배열 dict
+        """
+        n = len(timestamps)
+        self._reserve(self._n + n)
+        
+        self._ts[self._n:self._n + n] = timestamps
+        for col in SENSOR_COLUMNS:
+            self._cols[col][self._n:self._n + n] = columns[col]
+        self._n += n
+        self.version += 1
+    
+    def _drop_oldest(self, count):
+        """오래된 데이터 count개를 버리고 나머지를 버퍼 앞으로 당김"""
+        if self._persisted_n < count:
+            self.save_to_csv()  # 버리기 전에 파일에 기록
+        
+        # 남길 구간을 새 배열로 복사 (기존 배열을 참조하는 DataFrame은 그대로 유지)
+        keep = self._n - count
+        ts = np.empty(self._cap, dtype='datetime64[s]')
+        ts[:keep] = self._ts[count:self._n]
+        self._ts = ts
+        for col in SENSOR_COLUMNS:
+            arr = np.empty(self._cap, dtype=np.float32)
+            arr[:keep] = self._cols[col][count:self._n]
+            self._cols[col] = arr
+        self._n = keep
+        # 버린 행은 모두 파일에 있으므로 0이 되어도 다음 저장은 파일 끝에 이어 쓴다
+        self._persisted_n -= count
+        self.version += 1
+    
     def add_data(self, data):
         """
         새로운 센서 데이터 추가
         
         Args:
-            data: dict with keys: soil_upper, soil_lower, soil_moisture, 
-                  temperature, humidity
+            data: dict with keys: soil_upper, soil_lower, temperature, humidity
+                  (soil_moisture는 상단/하단 평균으로 계산)
+        
+        Returns:
+            float: 저장된 평균 토양 수분
         """
-        record = {
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'soil_upper': data.get('soil_upper', 0),
-            'soil_lower': data.get('soil_lower', 0),
-            'soil_moisture': data.get('soil_moisture', 0),
-            'temperature': data.get('temperature', 0),
-            'humidity': data.get('humidity', 0)
-        }
+        # 최대 크기에 도달하면 오래된 절반을 버려 메모리 사용량을 고정
+        if self.max_rows and self._n >= self.max_rows:
+            self._drop_oldest(self._n - self.max_rows // 2)
+        
+        self._reserve(self._n + 1)
         
-        self.data_buffer.append(record)
+        self._ts[self._n] = np.datetime64(datetime.now(), 's')  # 시뮬레이션, CSV와 같은 로컬 시간
+        soil_upper = float(data.get('soil_upper', 0))
+        soil_lower = float(data.get('soil_lower', 0))
+        moisture = (soil_upper + soil_lower) * 0.5
+        
+        cols = self._cols
+        cols['soil_upper'][self._n] = soil_upper
+        cols['soil_lower'][self._n] = soil_lower
+        cols['soil_moisture'][self._n] = moisture
+        cols['temperature'][self._n] = data.get('temperature', 0)
+        cols['humidity'][self._n] = data.get('humidity', 0)
+        self._n += 1
+        self.version += 1
         
         # 자동 저장 (100개마다)
-        if len(self.data_buffer) % 100 == 0:
+        if self._n - self._persisted_n >= 100:
             self.save_to_csv()
+        
+        return moisture
     
     def get_dataframe(self):
-        """버퍼 데이터를 DataFrame으로 반환"""
-        if not self.data_buffer:
+        """
+        버퍼 데이터를 DataFrame으로 반환
+        
+        복사 없이 버퍼 배열을 그대로 참조하는 DataFrame을 만든다.
+        """
+        if self._n == 0:
             return pd.DataFrame()
         
-        df = pd.DataFrame(self.data_buffer)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        return df
+        n = self._n
+        columns = {'timestamp': self._ts[:n]}
+        columns.update({col: arr[:n] for col, arr in self._cols.items()})
+        return pd.DataFrame(columns, copy=False)
     
     def save_to_csv(self):
-        """데이터를 CSV 파일로 저장"""
-        if not self.data_buffer:
+        """
+        데이터를 CSV 파일로 저장
+        
+        마지막 저장 이후 추가된 데이터만 파일 끝에 이어 쓴다.
+        시뮬레이션 데이터 생성이나 clear_buffer()로 버퍼를 새로 시작한 경우에만
+        파일을 새로 쓰고, 그 외에는 파일이 있으면 항상 이어 쓴다.
+        """
+        if self._n == self._persisted_n:
             print("[저장] 저장할 데이터가 없습니다.")
             return
         
-        df = self.get_dataframe()
-        df.to_csv(self.csv_path, index=False)
-        print(f"[저장] {len(df)}개 데이터 저장 완료: {self.csv_path}")
+        new_rows = self.get_dataframe().iloc[self._persisted_n:]
+        append = not self._overwrite_csv and os.path.exists(self.csv_path)
+        if append and os.path.getsize(self.csv_path) == 0:
+            append = False
+        if append:
+            # 전원 차단 등으로 마지막 줄이 잘렸으면 새 행이 그 줄에 붙지 않도록 줄을 바꿈
+            with open(self.csv_path, 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+        new_rows.to_csv(self.csv_path, mode='a' if append else 'w', header=not append,
+                        index=False, date_format=TIMESTAMP_FORMAT, float_format='%.2f')
+        self._persisted_n = self._n
+        self._overwrite_csv = False
+        print(f"[저장] {len(new_rows)}개 데이터 저장 완료 (버퍼 {self._n}개): {self.csv_path}")
     
     def load_from_csv(self):
-        """CSV 파일에서 데이터 로드"""
+        """
+        CSV 파일에서 데이터 로드 (pyarrow 멀티스레드 파서 사용)
+        
+        잘린 줄처럼 컬럼 수가 맞지 않는 행은 건너뛴다.
+        로드에 실패해도 이후 저장은 기존 파일에 이어 쓰므로 파일이 지워지지 않는다.
+        """
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        
         try:
-            df = pd.read_csv(self.csv_path)
-            self.data_buffer = df.to_dict('records')
-            print(f"[로드] {len(self.data_buffer)}개 데이터 로드 완료")
+            # 컬럼 타입을 미리 지정해 타입 추론 없이 버퍼와 같은 형식으로 바로 파싱
+            column_types = {'timestamp': pa.timestamp('s')}
+            column_types.update({col: pa.float32() for col in SENSOR_COLUMNS})
+            table = pacsv.read_csv(
+                self.csv_path,
+                parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+                convert_options=pacsv.ConvertOptions(
+                    column_types=column_types,
+                    include_columns=list(column_types)
+                )
+            )
+            
+            self._reset()
+            self._extend(table['timestamp'].to_numpy(),
+                         {col: table[col].to_numpy() for col in SENSOR_COLUMNS})
+            self._persisted_n = self._n
+            print(f"[로드] {self._n}개 데이터 로드 완료")
         except Exception as e:
             print(f"[로드 오류] {e}")
     
-    def load_simulation_data(self, days=14):
+    def load_simulation_data(self, days=14, use_weather=True, verbose=False):
         """
         시뮬레이션용 고품질 데이터 생성
         Mendeley 오픈 데이터(Arduino 기반 토양 수분 데이터) 구조 참고
@@ -88,133 +297,88 @@ class DataCollector:
         
         Args:
             days: 생성할 데이터 일수
+            use_weather: False면 날씨 변화 없이 맑은 날 패턴만 사용
+            verbose: True면 비/급수 이벤트를 하나씩 출력
         """
         print(f"[시뮬레이션] {days}일치 고품질 데이터 생성 중...")
         
-        np.random.seed(42)  # 재현성을 위한 시드 고정
+        rng = np.random.default_rng(42)  # 재현성을 위한 시드 고정
         
         # 시간 설정 (1시간 간격, days일치)
         hours = days * 24
         start_time = datetime.now() - timedelta(days=days)
-        timestamps = [start_time + timedelta(hours=i) for i in range(hours)]
+        timestamps = pd.date_range(start_time, periods=hours, freq=pd.Timedelta(hours=1))
+        hour_of_day = (start_time.hour + np.arange(hours)) % 24
         
-        data = []
+        # 날씨 상태 (0: 맑음 60%, 1: 흐림 25%, 2: 비 15%)
+        # 하루 단위로 날씨 변경
+        if use_weather:
+            weather = np.repeat(rng.choice([0, 1, 2], size=days, p=[0.6, 0.25, 0.15]), 24)
+        else:
+            weather = np.zeros(hours, dtype=np.int64)
         
-        # 초기값
-        soil_moisture = 55.0  # 초기 토양 수분 (%)
-        last_watering = 0     # 마지막 급수 시점
+        # === 온도 시뮬레이션 ===
+        # 맑음: 일교차 큼, 흐림/비: 일교차 작음 (날씨별 값은 조회 테이블로 인덱싱)
+        base_temp_lut = np.array([24.0, 22.0, 20.0])
+        amp_lut = np.array([8.0, 4.0, 2.0])
+        noise_sigma_lut = np.array([0.5, 0.3, 0.2])
         
-        # 날씨 상태 (0: 맑음, 1: 흐림, 2: 비)
-        # 하루 단위로 날씨 변경
-        weather_pattern = []
-        for _ in range(days):
-            r = np.random.random()
-            if r < 0.6: weather = 0      # 맑음 (60%)
-            elif r < 0.85: weather = 1   # 흐림 (25%)
-            else: weather = 2            # 비 (15%)
-            weather_pattern.extend([weather] * 24)
-            
-        for i, ts in enumerate(timestamps):
-            hour = ts.hour
-            current_weather = weather_pattern[i]
-            
-            # === 온도 시뮬레이션 ===
-            # 맑음: 일교차 큼, 흐림/비: 일교차 작음
-            base_temp = 24.0
-            
-            if current_weather == 0:   # 맑음
-                daily_variation = 8.0 * np.sin((hour - 4) * np.pi / 12)
-                temp_noise = 0.5
-            elif current_weather == 1: # 흐림
-                daily_variation = 4.0 * np.sin((hour - 4) * np.pi / 12)
-                temp_noise = 0.3
-                base_temp -= 2.0
-            else:                      # 비
-                daily_variation = 2.0 * np.sin((hour - 4) * np.pi / 12)
-                temp_noise = 0.2
-                base_temp -= 4.0
-                
-            noise = np.random.normal(0, temp_noise)
-            temperature = base_temp + daily_variation + noise
-            temperature = np.clip(temperature, 10, 40)
-            
-            # === 습도 시뮬레이션 ===
-            # 비 > 흐림 > 맑음
-            if current_weather == 0:   # 맑음
-                base_humid = 50.0
-                humid_var = -1.0 * daily_variation # 온도와 반비례
-            elif current_weather == 1: # 흐림
-                base_humid = 70.0
-                humid_var = -0.5 * daily_variation
-            else:                      # 비
-                base_humid = 90.0
-                humid_var = -0.2 * daily_variation
-            
-            humid_noise = np.random.normal(0, 2)
-            humidity = base_humid + humid_var + humid_noise
-            humidity = np.clip(humidity, 30, 100)
-            
-            # === 토양 수분 시뮬레이션 ===
-            # 증발률: 온도 높음, 습도 낮음, 맑음 -> 높음
-            evaporation = 0.0
-            
-            if current_weather == 0: # 맑음
-                evaporation = 0.4 + 0.1 * (temperature - 20) / 10
-                if 10 <= hour <= 16: evaporation *= 1.8 # 낮 시간 가속
-            elif current_weather == 1: # 흐림
-                evaporation = 0.1 + 0.05 * (temperature - 20) / 10
-            else: # 비
-                evaporation = -0.5 # 오히려 습기 참 (빗물)
-            
-            # 토양 수분 변화
-            if current_weather == 2: # 비 오는 중
-                soil_moisture += np.random.uniform(1.0, 3.0) # 자연 급수
-                print(f"  [날씨] 비 내림 🌧️ ({ts.strftime('%m-%d %H:%M')}) - 수분 증가")
-            else:
-                soil_moisture -= evaporation + np.random.normal(0, 0.1)
-            
-            # 인공 급수 시뮬레이션 (수분이 25% 이하로 떨어지면 급수)
-            # 비가 오지 않을 때만
-            if soil_moisture < 25 and current_weather != 2:
-                soil_moisture += np.random.uniform(30, 40)  # 급수로 대폭 상승
-                last_watering = i
-                print(f"  [급수 이벤트] 💧 {ts.strftime('%m-%d %H:%M')} - 수분 {soil_moisture:.1f}%로 회복")
-            
-            # 급수/비 직후 수분 서서히 분산 (drainage)
-            if soil_moisture > 80:
-                soil_moisture -= np.random.uniform(2, 4) # 배수 빠름
-            elif i - last_watering < 3 and current_weather != 2:
-                soil_moisture -= np.random.uniform(1, 2)
-            
-            soil_moisture = np.clip(soil_moisture, 10, 95)
-            
-            # 상단/하단 센서 차이 (비 올때는 상단이 훨씬 높음)
-            if current_weather == 2:
-                soil_upper = soil_moisture + np.random.uniform(2, 5)
-                soil_lower = soil_moisture - np.random.uniform(1, 3)
-            else:
-                soil_upper = soil_moisture - np.random.uniform(1, 4) # 상단이 더 빨리 마름
-                soil_lower = soil_moisture + np.random.uniform(0, 2)
-            
-            data.append({
-                'timestamp': ts.strftime('%Y-%m-%d %H:%M:%S'),
-                'soil_upper': round(soil_upper, 1),
-                'soil_lower': round(soil_lower, 1),
-                'soil_moisture': round((soil_upper + soil_lower) / 2, 1),
-                'temperature': round(temperature, 1),
-                'humidity': round(humidity, 1),
-                'weather': ['Sunny', 'Cloudy', 'Rainy'][current_weather] # 디버깅용
-            })
-        
-        self.data_buffer = data
-        print(f"[시뮬레이션] {len(data)}개 고품질 데이터 생성 완료 (날씨 반영)")
+        daily_variation = amp_lut[weather] * _HOURLY_SIN[hour_of_day]
+        temperature = base_temp_lut[weather] + daily_variation + rng.normal(0, noise_sigma_lut[weather])
+        temperature = np.clip(temperature, 10, 40)
+        
+        # === 습도 시뮬레이션 ===
+        # 비 > 흐림 > 맑음, 온도와 반비례
+        base_humid_lut = np.array([50.0, 70.0, 90.0])
+        humid_var_lut = np.array([-1.0, -0.5, -0.2])
+        
+        humidity = base_humid_lut[weather] + humid_var_lut[weather] * daily_variation + rng.normal(0, 2, size=hours)
+        humidity = np.clip(humidity, 30, 100)
+        
+        # === 토양 수분 시뮬레이션 ===
+        # 이전 시점 상태에 의존하므로 난수만 미리 뽑고 순차 계산은 JIT 커널에서 수행
+        # 배수량, 상단/하단 센서 편차는 0~1 난수로 뽑아 커널에서 스케일
+        drain, upper_offset, lower_offset = rng.random((3, hours))
+        soil_moisture, soil_upper, soil_lower, watered = _simulate_moisture(
+            temperature, weather, hour_of_day,
+            rng.normal(0, 0.1, size=hours),     # 증발 노이즈
+            rng.uniform(1.0, 3.0, size=hours),  # 빗물 유입량
+            rng.uniform(30, 40, size=hours),    # 급수량
+            drain, upper_offset, lower_offset
+        )
+        
+        self._reset()
+        self._extend(timestamps.to_numpy(dtype='datetime64[s]'), {
+            'soil_upper': soil_upper,
+            'soil_lower': soil_lower,
+            'soil_moisture': (soil_upper + soil_lower) / 2,
+            'temperature': temperature,
+            'humidity': humidity
+        })
+        
+        # 이벤트 로그는 시뮬레이션이 끝난 뒤 한 번에 출력
+        rain_events = np.flatnonzero(weather == 2)
+        water_events = np.flatnonzero(watered)
+        
+        if verbose:
+            for i in np.union1d(rain_events, water_events):
+                if weather[i] == 2:
+                    print(f"  [날씨] 비 내림 🌧️ ({timestamps[i].strftime('%m-%d %H:%M')}) - 수분 증가")
+                else:
+                    print(f"  [급수 이벤트] 💧 {timestamps[i].strftime('%m-%d %H:%M')} - 수분 {soil_moisture[i]:.1f}%로 회복")
+        
+        self._overwrite_csv = True
+        print(f"[시뮬레이션] 비 {len(rain_events)}회, 급수 {len(water_events)}회 발생")
+        suffix = " (날씨 반영)" if use_weather else ""
+        print(f"[시뮬레이션] {self._n}개 고품질 데이터 생성 완료{suffix}")
         
         # 데이터 통계 출력
         df = self.get_dataframe()
         print(f"\n📊 데이터 통계:")
         print(f"  - 토양 수분: {df['soil_moisture'].min():.1f}% ~ {df['soil_moisture'].max():.1f}%")
         print(f"  - 온도: {df['temperature'].min():.1f}°C ~ {df['temperature'].max():.1f}°C")
-        print(f"  - 날씨 분포: 맑음 {weather_pattern.count(0)/24}일, 흐림 {weather_pattern.count(1)/24}일, 비 {weather_pattern.count(2)/24}일")
+        weather_days = np.bincount(weather[::24], minlength=3)  # 하루 단위 날씨별 일수
+        print(f"  - 날씨 분포: 맑음 {weather_days[0]}일, 흐림 {weather_days[1]}일, 비 {weather_days[2]}일")
         
         return df
     
@@ -229,7 +393,9 @@ class DataCollector:
     
     def clear_buffer(self):
         """버퍼 초기화"""
-        self.data_buffer = []
+        self._reset()
+        self._overwrite_csv = True
+        self.version += 1
         print("[초기화] 데이터 버퍼 초기화 완료")
 
 
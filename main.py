@@ -6,13 +6,14 @@ AI기반 예측형 스마트 관개 시스템
 메인 통합 모듈: 시리얼 통신 + AI 예측 + 급수 제어
 """
 
-import serial
+import re
+import struct
 import time
-import threading
+import asyncio
+import numpy as np
 from datetime import datetime
 from data_collector import DataCollector
 from ai_predictor import SoilMoisturePredictor
-from visualizer import RealTimeVisualizer
 
 # ============== 설정 ==============
 SERIAL_PORT = ''  # Windows: 'COM3', Linux/Mac: '/dev/ttyUSB0'
@@ -20,28 +21,62 @@ BAUD_RATE = 9600
 MOISTURE_THRESHOLD = 35.0  # 급수 임계값 (%)
 WATERING_DURATION = 180    # 급수 시간 (초)
 PREDICTION_INTERVAL = 300  # 예측 주기 (5분 = 300초)
+MAX_BUFFER_ROWS = 12 * 24 * 30  # 메모리에 유지할 최대 데이터 수 (5분 간격 30일)
+RETRAIN_ROWS = 12 * 24  # 추가 학습 주기 (새 데이터 수, 5분 간격 1일)
+BINARY_PROTOCOL = False  # True면 바이너리 프레임 수신 (아두이노 BINARY_PROTOCOL과 맞춰야 함)
+
+# 아두이노 전송 키 -> 센서 데이터 키
+_KEY_MAP = {
+    b'SOIL_UP': 'soil_upper',
+    b'SOIL_LOW': 'soil_lower',
+    b'TEMP': 'temperature',
+    b'HUMID': 'humidity'
+}
+_LINE_RE = re.compile(rb'([A-Z_]+):(-?\d+(?:\.\d+)?)')  # "KEY:값" 쌍
+_WATER_PREFIX = b'WATER_ON:'  # 급수 명령 접두사 (미리 인코딩)
+
+# 바이너리 센서 프레임: 시작 바이트 0xAA + uint16 x 4 (값 x 100, 리틀 엔디언) = 9바이트
+_FRAME = struct.Struct('<BHHHH')
+_FRAME_TAG = b'\xaa'
+_FRAME_MAX_PERCENT = 10000      # 토양 수분/습도 최대값 (100.00% x 100)
+_FRAME_MAX_TEMPERATURE = 8000   # 온도 최대값 (80.00°C x 100, DHT11 측정 범위 0~50°C)
 
 class SmartIrrigationSystem:
     """스마트 관개 시스템 메인 클래스"""
     
-    def __init__(self, port=SERIAL_PORT, baud_rate=BAUD_RATE, simulation=True):
+    def __init__(self, port=SERIAL_PORT, baud_rate=BAUD_RATE, simulation=True,
+                 binary_protocol=BINARY_PROTOCOL):
         """
         Args:
             port: 시리얼 포트
             baud_rate: 통신 속도
             simulation: True면 시뮬레이션 모드 (아두이노 없이 테스트)
+            binary_protocol: True면 9바이트 바이너리 프레임, False면 ASCII 줄 단위 수신
         """
         self.simulation = simulation
+        self.binary_protocol = binary_protocol
         self.running = False
         self.serial_conn = None
+        self._serial_transport = None  # 이벤트 루프에서 사용하는 시리얼 트랜스포트
+        self._loop = None              # 시리얼 트랜스포트를 소유한 이벤트 루프
         
         # 모듈 초기화
-        self.collector = DataCollector()
+        self.collector = DataCollector(max_rows=MAX_BUFFER_ROWS)
         self.predictor = SoilMoisturePredictor()
         self.visualizer = None  # 필요시 초기화
         
+        # 마지막 예측 캐시 (새 데이터가 없으면 재계산하지 않음)
+        self._last_version = None
+        self._last_prediction = None
+        self._last_train_ts = None  # 마지막으로 학습에 사용한 데이터의 타임스탬프
+        if self.predictor.model is not None and len(self.collector):
+            # 저장된 모델로 재시작하면 CSV에서 불러온 기존 데이터는 다시 학습하지 않음
+            self._last_train_ts = self.collector.get_dataframe()['timestamp'].iloc[-1]
+        
         # 시리얼 연결 (시뮬레이션 모드가 아닐 때만)
         if not simulation:
+            import serial  # pyserial은 실제 모드에서만 필요
+            
             try:
                 self.serial_conn = serial.Serial(port, baud_rate, timeout=1)
                 print(f"[시리얼] {port} 연결 성공")
@@ -54,35 +89,46 @@ class SmartIrrigationSystem:
     def parse_sensor_data(self, line):
         """
         아두이노에서 받은 데이터 파싱
-        형식: "SOIL:45.2,TEMP:25.3,HUMID:60.5"
+        형식: b"SOIL_UP:45.2,SOIL_LOW:48.5,TEMP:25.3,HUMID:60.5"
+        
+        Args:
+            line: 시리얼로 받은 한 줄 (bytes, 디코딩 없이 그대로 파싱)
         
         Returns:
             dict: {'soil_upper': float, 'soil_lower': float, 'temperature': float, 'humidity': float}
+                  센서 데이터가 아닌 줄이면 빈 dict
         """
-        try:
-            data = {}
-            parts = line.strip().split(',')
-            
-            for part in parts:
-                key, value = part.split(':')
-                if key == 'SOIL_UP':
-                    data['soil_upper'] = float(value)
-                elif key == 'SOIL_LOW':
-                    data['soil_lower'] = float(value)
-                elif key == 'TEMP':
-                    data['temperature'] = float(value)
-                elif key == 'HUMID':
-                    data['humidity'] = float(value)
-            
-            # 평균 토양 수분 계산
-            if 'soil_upper' in data and 'soil_lower' in data:
-                data['soil_moisture'] = (data['soil_upper'] + data['soil_lower']) / 2
-            
-            return data
-            
-        except Exception as e:
-            print(f"[파싱 오류] {e}: {line}")
-            return None
+        data = {}
+        for key, value in _LINE_RE.findall(line):
+            name = _KEY_MAP.get(key)
+            if name:
+                data[name] = float(value)
+        
+        return data
+    
+    def parse_sensor_frame(self, frame):
+        """
+        아두이노에서 받은 바이너리 프레임 파싱
+        형식: 0xAA + uint16(SOIL_UP*100) + uint16(SOIL_LOW*100) + uint16(TEMP*100) + uint16(HUMID*100)
+        
+        Args:
+            frame: 시작 바이트를 포함한 9바이트
+        
+        Returns:
+            dict: parse_sensor_data()와 같은 형식
+                  값이 측정 범위를 벗어나면(프레임 경계가 어긋난 경우) 빈 dict
+        """
+        _, soil_upper, soil_lower, temperature, humidity = _FRAME.unpack(frame)
+        if (soil_upper > _FRAME_MAX_PERCENT or soil_lower > _FRAME_MAX_PERCENT
+                or humidity > _FRAME_MAX_PERCENT or temperature > _FRAME_MAX_TEMPERATURE):
+            return {}
+        
+        return {
+            'soil_upper': soil_upper / 100,
+            'soil_lower': soil_lower / 100,
+            'temperature': temperature / 100,
+            'humidity': humidity / 100
+        }
     
     def send_water_command(self, duration=WATERING_DURATION):
         """
@@ -91,13 +137,17 @@ class SmartIrrigationSystem:
         Args:
             duration: 급수 시간 (초)
         """
-        command = f"WATER_ON:{duration}\n"
+        command = _WATER_PREFIX + b"%d\n" % int(duration)
         
         if self.simulation:
-            print(f"[시뮬레이션] 급수 명령 전송: {command.strip()}")
+            print(f"[시뮬레이션] 급수 명령 전송: {command.decode().strip()}")
         else:
             try:
-                self.serial_conn.write(command.encode())
+                if self._serial_transport is not None:
+                    # 예측은 작업 스레드에서 돌기 때문에 쓰기는 이벤트 루프 스레드에 맡김
+                    self._loop.call_soon_threadsafe(self._serial_transport.write, command)
+                else:
+                    self.serial_conn.write(command)
                 print(f"[급수] 명령 전송: {duration}초 동안 급수")
             except Exception as e:
                 print(f"[급수 오류] {e}")
@@ -105,19 +155,30 @@ class SmartIrrigationSystem:
     def check_and_water(self):
         """예측 기반 급수 판단"""
         # 충분한 데이터가 있는지 확인 (최소 12시간 = 144개 데이터)
-        if len(self.collector.data_buffer) < 12:
-            print(f"[예측] 데이터 부족 ({len(self.collector.data_buffer)}/12), 대기 중...")
+        if len(self.collector) < 12:
+            print(f"[예측] 데이터 부족 ({len(self.collector)}/12), 대기 중...")
             return
         
-        # AI 모델 학습 및 예측
-        df = self.collector.get_dataframe()
-        
-        if self.predictor.model is None:
-            print("[예측] 모델 학습 중...")
-            self.predictor.train(df)
-        
-        # 1시간 후 토양 수분 예측
-        prediction = self.predictor.predict_next(df)
+        # 마지막 예측 이후 새 데이터가 없으면 이전 예측 재사용
+        # (수신은 이벤트 루프 스레드에서 계속되므로 버전을 데이터보다 먼저 읽음)
+        version = self.collector.version
+        if version == self._last_version:
+            prediction = self._last_prediction
+        else:
+            # AI 모델 학습 및 예측
+            df = self.collector.get_dataframe()
+            
+            if self.predictor.model is None:
+                print("[예측] 모델 학습 중...")
+                self.predictor.train(df)
+                self._last_train_ts = df['timestamp'].iloc[-1]
+            else:
+                self._train_on_new_data(df)
+            
+            # 1시간 후 토양 수분 예측 (특성 계산에 필요한 최근 구간만 전달)
+            prediction = self.predictor.predict_next(df.tail(self.predictor.lookback))
+            self._last_version = version
+            self._last_prediction = prediction
         
         if prediction is not None:
             print(f"[예측] 1시간 후 토양 수분: {prediction:.1f}%")
@@ -130,26 +191,91 @@ class SmartIrrigationSystem:
             else:
                 print(f"[판단] 수분 충분 - 급수 불필요")
     
-    def read_serial_data(self):
-        """시리얼 데이터 읽기 (스레드)"""
+    def _train_on_new_data(self, df):
+        """마지막 학습 이후 데이터가 RETRAIN_ROWS개 이상 쌓이면 새 구간으로 추가 학습"""
+        timestamps = df['timestamp'].to_numpy()
+        # 버퍼가 오래된 데이터를 버려도 위치가 어긋나지 않도록 타임스탬프로 위치 탐색
+        start = 0
+        if self._last_train_ts is not None:
+            start = int(np.searchsorted(timestamps, np.datetime64(self._last_train_ts), side='right'))
+        if len(df) - start < RETRAIN_ROWS:
+            return
+        
+        # 특성 계산에 필요한 직전 구간을 포함해 전달
+        delta = df.iloc[max(0, start - self.predictor.lookback):]
+        print("[예측] 새 데이터로 추가 학습 중...")
+        self.predictor.partial_train(delta)
+        self._last_train_ts = timestamps[-1]
+    
+    async def _read_frame(self, reader):
+        """
+        바이너리 프레임 1개 수신
+        
+        시작 바이트(0xAA)는 페이로드에도 나올 수 있으므로, 값이 범위를 벗어나면
+        프레임을 버리고 받은 바이트 안의 다음 0xAA부터 경계를 다시 맞춘다.
+        
+        Returns:
+            dict: parse_sensor_frame() 결과 (항상 유효한 값)
+        """
+        frame = b''
+        while True:
+            start = frame.find(_FRAME_TAG, 1)
+            if start < 0:
+                # 시작 바이트까지 읽고(앞선 상태 메시지 등 텍스트는 버림) 나머지 8바이트 수신
+                await reader.readuntil(_FRAME_TAG)
+                frame = _FRAME_TAG + await reader.readexactly(_FRAME.size - 1)
+            else:
+                frame = frame[start:] + await reader.readexactly(start)
+            
+            data = self.parse_sensor_frame(frame)
+            if data:
+                return data
+            print(f"[시리얼] 잘못된 프레임 무시: {frame.hex()}")
+    
+    async def read_serial_data(self):
+        """시리얼 데이터 읽기 (이벤트 루프에서 줄 또는 프레임 단위로 대기)"""
+        import serial_asyncio
+        
+        # 이미 열린 시리얼 포트를 asyncio 스트림으로 감쌈
+        self._loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        self._serial_transport = serial_asyncio.SerialTransport(
+            self._loop, asyncio.StreamReaderProtocol(reader), self.serial_conn)
+        
         while self.running:
             try:
-                if self.serial_conn and self.serial_conn.in_waiting:
-                    line = self.serial_conn.readline().decode('utf-8').strip()
-                    
-                    if line:
-                        data = self.parse_sensor_data(line)
-                        if data:
-                            self.collector.add_data(data)
-                            print(f"[수신] 토양수분: {data.get('soil_moisture', 0):.1f}%, "
-                                  f"온도: {data.get('temperature', 0):.1f}°C, "
-                                  f"습도: {data.get('humidity', 0):.1f}%")
+                if self.binary_protocol:
+                    data = await self._read_frame(reader)
+                else:
+                    line = await reader.readline()
+                    if not line:  # 포트가 닫힘
+                        break
+                    data = self.parse_sensor_data(line)
                 
-                time.sleep(0.1)
+                if data:
+                    moisture = self.collector.add_data(data)  # 평균 토양 수분은 수집기에서 계산
+                    print(f"[수신] 토양수분: {moisture:.1f}%, "
+                          f"온도: {data.get('temperature', 0):.1f}°C, "
+                          f"습도: {data.get('humidity', 0):.1f}%")
                 
+            except asyncio.IncompleteReadError:  # 프레임 도중 포트가 닫힘
+                break
             except Exception as e:
                 print(f"[시리얼 읽기 오류] {e}")
-                time.sleep(1)
+                await asyncio.sleep(1)
+    
+    async def _prediction_loop(self):
+        """예측 주기마다 급수 판단 (학습이 수 초 걸리므로 작업 스레드에서 실행해 수신을 막지 않음)"""
+        while self.running:
+            await asyncio.to_thread(self.check_and_water)
+            await asyncio.sleep(PREDICTION_INTERVAL)
+    
+    async def _main(self):
+        """시리얼 수신과 주기적 예측을 하나의 이벤트 루프에서 실행"""
+        tasks = [asyncio.create_task(self._prediction_loop())]
+        if self.serial_conn is not None:
+            tasks.append(asyncio.create_task(self.read_serial_data()))
+        await asyncio.gather(*tasks)
     
     def run_simulation(self):
         """시뮬레이션 모드 실행"""
@@ -175,11 +301,17 @@ class SmartIrrigationSystem:
         # 예측 테스트
         print("\n[3단계] 예측 테스트...")
         recent_data = df.tail(24)  # 최근 24시간 데이터
+        moisture = recent_data['soil_moisture'].to_numpy()
+        temperature = recent_data['temperature'].to_numpy()
+        humidity = recent_data['humidity'].to_numpy()
+        hours = recent_data['timestamp'].dt.hour.to_numpy()
         
         for i in range(5):
-            test_df = recent_data.iloc[:12+i]
-            prediction = self.predictor.predict_next(test_df)
-            actual = recent_data.iloc[12+i]['soil_moisture'] if 12+i < len(recent_data) else None
+            n = 12 + i  # 앞의 n시간 데이터로 다음 1시간 예측
+            prediction = self.predictor.predict_next_array(
+                moisture[:n], temperature[n-1], humidity[n-1], hours[n-1]
+            )
+            actual = moisture[n] if n < len(moisture) else None
             
             status = "💧 급수 필요" if prediction < MOISTURE_THRESHOLD else "✅ 수분 충분"
             
@@ -191,6 +323,7 @@ class SmartIrrigationSystem:
         
         # 시각화
         print("\n[4단계] 시각화 생성 중...")
+        from visualizer import RealTimeVisualizer  # matplotlib 로드는 시각화 단계에서만
         self.visualizer = RealTimeVisualizer()
         self.visualizer.plot_analysis(df, self.predictor)
         
@@ -206,28 +339,13 @@ class SmartIrrigationSystem:
         
         self.running = True
         
-        # 시리얼 읽기 스레드 시작
-        serial_thread = threading.Thread(target=self.read_serial_data)
-        serial_thread.daemon = True
-        serial_thread.start()
-        
         print("\n시스템 시작! (Ctrl+C로 종료)")
         print(f"예측 주기: {PREDICTION_INTERVAL}초")
         print(f"급수 임계값: {MOISTURE_THRESHOLD}%\n")
         
-        last_prediction_time = 0
-        
         try:
-            while self.running:
-                current_time = time.time()
-                
-                # 예측 주기마다 급수 판단
-                if current_time - last_prediction_time >= PREDICTION_INTERVAL:
-                    self.check_and_water()
-                    last_prediction_time = current_time
-                
-                time.sleep(1)
-                
+            asyncio.run(self._main())
+            
         except KeyboardInterrupt:
             print("\n\n시스템 종료 중...")
             self.running = False
@@ -7,14 +7,180 @@
 
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-import pandas as pd
 import numpy as np
+import base64
+import io
+import string
+import types
 from datetime import datetime, timedelta
 import os
 
-# 한글 폰트 설정
-plt.rcParams['font.family'] = 'DejaVu Sans'
-plt.rcParams['axes.unicode_minus'] = False
+# 그래프 색상 (읽기 전용)
+_COLORS = {
+    'moisture': '#2E86AB',      # 파랑
+    'moisture_upper': '#A23B72', # 분홍
+    'moisture_lower': '#F18F01', # 주황
+    'temperature': '#C73E1D',    # 빨강
+    'humidity': '#3B1F2B',       # 진한 보라
+    'threshold': '#E74C3C',      # 임계값 빨강
+    'prediction': '#27AE60'      # 예측 초록
+}
+COLORS = types.MappingProxyType(_COLORS)
+
+_mpl_configured = False
+
+
+def _configure_mpl():
+    """matplotlib 전역 설정 (처음 한 번만 적용)"""
+    global _mpl_configured
+    if _mpl_configured:
+        return
+    
+    # 한글 폰트 설정
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    plt.rcParams['axes.unicode_minus'] = False
+    _mpl_configured = True
+
+
+MAX_PLOT_POINTS = 2000  # 시계열 그래프에 그릴 최대 데이터 수
+PLOT_DPI = 100          # 그래프 저장 해상도
+
+
+def _plot_step(n):
+    """n개 데이터를 MAX_PLOT_POINTS개 이하로 줄이기 위한 간격"""
+    return max(1, -(-n // MAX_PLOT_POINTS))
+
+
+# 대시보드 HTML 템플릿 (CSS 중괄호를 그대로 쓰기 위해 string.Template 사용)
+_DASHBOARD_TPL = string.Template("""<!DOCTYPE html>
+<html>
+<head>
+    <title>Smart Irrigation Dashboard</title>
+    <meta charset="UTF-8">
+    <style>
+        body {
+            font-family: 'Segoe UI', Arial, sans-serif;
+            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+            color: white;
+            margin: 0;
+            padding: 20px;
+        }
+        .header {
+            text-align: center;
+            padding: 20px;
+            background: rgba(255,255,255,0.1);
+            border-radius: 15px;
+            margin-bottom: 20px;
+        }
+        .header h1 {
+            margin: 0;
+            font-size: 2em;
+        }
+        .header p {
+            margin: 10px 0 0 0;
+            opacity: 0.8;
+        }
+        .dashboard {
+            display: grid;
+            grid-template-columns: repeat(4, 1fr);
+            gap: 20px;
+            margin-bottom: 20px;
+        }
+        .card {
+            background: rgba(255,255,255,0.1);
+            border-radius: 15px;
+            padding: 25px;
+            text-align: center;
+        }
+        .card h3 {
+            margin: 0 0 15px 0;
+            font-size: 0.9em;
+            opacity: 0.8;
+        }
+        .card .value {
+            font-size: 2.5em;
+            font-weight: bold;
+        }
+        .card .unit {
+            font-size: 0.8em;
+            opacity: 0.6;
+        }
+        .status-card {
+            grid-column: span 2;
+            background: ${status_color};
+        }
+        .status-card .value {
+            font-size: 1.8em;
+        }
+        .moisture { color: #3498DB; }
+        .temp { color: #E74C3C; }
+        .humid { color: #9B59B6; }
+        .predict { color: #2ECC71; }
+        .plots img {
+            width: 100%;
+            border-radius: 15px;
+        }
+        .footer {
+            text-align: center;
+            padding: 20px;
+            opacity: 0.6;
+            font-size: 0.9em;
+        }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>🌱 AI Smart Irrigation System</h1>
+        <p>Team: My Green Smart Farm | 2025 SCNU Hackathon</p>
+    </div>
+    
+    <div class="dashboard">
+        <div class="card">
+            <h3>SOIL MOISTURE</h3>
+            <div class="value moisture">${soil_moisture}</div>
+            <div class="unit">%</div>
+        </div>
+        <div class="card">
+            <h3>TEMPERATURE</h3>
+            <div class="value temp">${temperature}</div>
+            <div class="unit">°C</div>
+        </div>
+        <div class="card">
+            <h3>HUMIDITY</h3>
+            <div class="value humid">${humidity}</div>
+            <div class="unit">%</div>
+        </div>
+        <div class="card">
+            <h3>AI PREDICTION (1hr)</h3>
+            <div class="value predict">${prediction}</div>
+            <div class="unit">%</div>
+        </div>
+        <div class="card status-card">
+            <h3>SYSTEM STATUS</h3>
+            <div class="value">${status}</div>
+        </div>
+        <div class="card">
+            <h3>UPPER SENSOR</h3>
+            <div class="value moisture">${soil_upper}</div>
+            <div class="unit">%</div>
+        </div>
+        <div class="card">
+            <h3>LOWER SENSOR</h3>
+            <div class="value moisture">${soil_lower}</div>
+            <div class="unit">%</div>
+        </div>
+    </div>
+    
+    <div class="plots">${plots}</div>
+    
+    <div class="footer">
+        Last Updated: ${updated} | 
+        Threshold: 30% | Watering Duration: 180s
+    </div>
+</body>
+</html>
+""")
+
 
 class RealTimeVisualizer:
     """실시간 데이터 시각화 클래스"""
@@ -25,38 +191,46 @@ class RealTimeVisualizer:
             figsize: 그래프 크기
         """
         self.figsize = figsize
-        self.colors = {
-            'moisture': '#2E86AB',      # 파랑
-            'moisture_upper': '#A23B72', # 분홍
-            'moisture_lower': '#F18F01', # 주황
-            'temperature': '#C73E1D',    # 빨강
-            'humidity': '#3B1F2B',       # 진한 보라
-            'threshold': '#E74C3C',      # 임계값 빨강
-            'prediction': '#27AE60'      # 예측 초록
-        }
+        _configure_mpl()
+        
+        # 마지막 특성/예측 결과 캐시 (같은 df와 모델이면 재계산하지 않음)
+        self._pred_cache = None
     
-    def plot_sensor_data(self, df, save_path='sensor_plot.png'):
+    def _features_and_pred(self, df, predictor):
         """
-        센서 데이터 시각화 (3개 서브플롯)
+        특성 행렬과 전체 구간 예측값 계산 (직전 호출과 같은 df, 추론 모델이면 캐시 사용)
         
-        Args:
-            df: 센서 데이터 DataFrame
-            save_path: 저장 경로
+        Returns:
+            tuple: (X, y, y_pred) - 특성을 만들 수 없거나 모델이 없으면 y_pred는 None
         """
-        fig, axes = plt.subplots(3, 1, figsize=self.figsize, sharex=True)
-        fig.suptitle('Smart Irrigation System - Sensor Data', fontsize=14, fontweight='bold')
+        # 추론 모델(inference_model)은 학습/추가 학습마다 새 객체 (model은 warm start로 제자리 변경됨)
+        cache = self._pred_cache
+        if (cache is not None and cache[0] is df and cache[1] == len(df)
+                and cache[2] is predictor.inference_model):
+            return cache[3]
         
-        # 타임스탬프 변환
-        if df['timestamp'].dtype == 'object':
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+        X, y = predictor.create_features(df)
+        y_pred = None
+        if X is not None and predictor.model is not None:
+            y_pred = predictor.model.predict(X)
+        
+        # df 참조를 함께 보관해 같은 id의 다른 객체와 혼동되지 않게 함
+        self._pred_cache = (df, len(df), predictor.inference_model, (X, y, y_pred))
+        return X, y, y_pred
+    
+    def _draw_sensor_data(self, axes, df):
+        """센서 데이터 그래프를 3개의 축(토양 수분, 온도, 습도)에 그림"""
+        # 긴 시계열은 간격을 두고 추려서 그림 (렌더링 시간은 데이터 수에 비례)
+        df = df.iloc[::_plot_step(len(df))]
         
         # 1. 토양 수분 그래프
         ax1 = axes[0]
         ax1.plot(df['timestamp'], df['soil_moisture'], 
-                color=self.colors['moisture'], linewidth=2, label='Avg Moisture')
+                color=COLORS['moisture'], linewidth=2, label='Avg Moisture', rasterized=True)
         ax1.fill_between(df['timestamp'], df['soil_upper'], df['soil_lower'],
-                        alpha=0.3, color=self.colors['moisture'], label='Upper/Lower Range')
-        ax1.axhline(y=30, color=self.colors['threshold'], linestyle='--', 
+                        alpha=0.3, color=COLORS['moisture'], label='Upper/Lower Range',
+                        rasterized=True)
+        ax1.axhline(y=30, color=COLORS['threshold'], linestyle='--', 
                    linewidth=1.5, label='Threshold (30%)')
         ax1.set_ylabel('Soil Moisture (%)')
         ax1.set_ylim(0, 100)
@@ -67,7 +241,7 @@ class RealTimeVisualizer:
         # 2. 온도 그래프
         ax2 = axes[1]
         ax2.plot(df['timestamp'], df['temperature'], 
-                color=self.colors['temperature'], linewidth=2)
+                color=COLORS['temperature'], linewidth=2, rasterized=True)
         ax2.set_ylabel('Temperature (C)')
         ax2.grid(True, alpha=0.3)
         ax2.set_title('Temperature')
@@ -75,7 +249,7 @@ class RealTimeVisualizer:
         # 3. 습도 그래프
         ax3 = axes[2]
         ax3.plot(df['timestamp'], df['humidity'], 
-                color=self.colors['humidity'], linewidth=2)
+                color=COLORS['humidity'], linewidth=2, rasterized=True)
         ax3.set_ylabel('Humidity (%)')
         ax3.set_xlabel('Time')
         ax3.grid(True, alpha=0.3)
@@ -84,45 +258,27 @@ class RealTimeVisualizer:
         # X축 포맷
         ax3.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d %H:%M'))
         ax3.xaxis.set_major_locator(mdates.HourLocator(interval=12))
-        plt.xticks(rotation=45)
-        
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=150, bbox_inches='tight')
-        print(f"[시각화] 센서 데이터 그래프 저장: {save_path}")
-        plt.close()
+        ax3.tick_params(axis='x', labelrotation=45)
     
-    def plot_prediction(self, df, predictor, save_path='prediction_plot.png'):
-        """
-        예측 결과 시각화
-        
-        Args:
-            df: 센서 데이터 DataFrame
-            predictor: SoilMoisturePredictor 인스턴스
-            save_path: 저장 경로
-        """
-        fig, axes = plt.subplots(2, 1, figsize=(14, 8))
-        fig.suptitle('AI Prediction Analysis', fontsize=14, fontweight='bold')
-        
-        if df['timestamp'].dtype == 'object':
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
+    def _draw_prediction(self, axes, df, predictor):
+        """실제/예측 비교와 예측 오차 분포를 2개의 축에 그림"""
         # 1. 실제 vs 예측 비교
         ax1 = axes[0]
         
         # 특성 생성 및 예측
-        X, y = predictor.create_features(df)
-        if X is not None and predictor.model is not None:
-            y_pred = predictor.model.predict(X)
-            
-            # 시간 인덱스 맞추기
-            valid_timestamps = df['timestamp'].iloc[len(df)-len(y):]
+        X, y, y_pred = self._features_and_pred(df, predictor)
+        if y_pred is not None:
+            # 시간 인덱스 맞추기 (긴 시계열은 간격을 두고 추려서 그림)
+            step = _plot_step(len(y))
+            valid_timestamps = df['timestamp'].iloc[len(df)-len(y)::step]
             
-            ax1.plot(valid_timestamps, y.values, 
-                    color=self.colors['moisture'], linewidth=2, label='Actual', alpha=0.8)
-            ax1.plot(valid_timestamps, y_pred, 
-                    color=self.colors['prediction'], linewidth=2, 
-                    linestyle='--', label='Predicted', alpha=0.8)
-            ax1.axhline(y=30, color=self.colors['threshold'], 
+            ax1.plot(valid_timestamps, y[::step], 
+                    color=COLORS['moisture'], linewidth=2, label='Actual', alpha=0.8,
+                    rasterized=True)
+            ax1.plot(valid_timestamps, y_pred[::step], 
+                    color=COLORS['prediction'], linewidth=2, 
+                    linestyle='--', label='Predicted', alpha=0.8, rasterized=True)
+            ax1.axhline(y=30, color=COLORS['threshold'], 
                        linestyle=':', linewidth=1.5, label='Threshold')
             
             ax1.set_ylabel('Soil Moisture (%)')
@@ -132,19 +288,102 @@ class RealTimeVisualizer:
         
         # 2. 예측 오차 분포
         ax2 = axes[1]
-        if X is not None and predictor.model is not None:
-            errors = y.values - y_pred
-            ax2.hist(errors, bins=30, color=self.colors['moisture'], 
-                    alpha=0.7, edgecolor='black')
-            ax2.axvline(x=0, color=self.colors['threshold'], 
+        if y_pred is not None:
+            errors = y - y_pred
+            counts, edges = np.histogram(errors, bins=30)
+            ax2.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                   color=COLORS['moisture'], alpha=0.7, edgecolor='black')
+            ax2.axvline(x=0, color=COLORS['threshold'], 
                        linestyle='--', linewidth=2)
             ax2.set_xlabel('Prediction Error (%)')
             ax2.set_ylabel('Frequency')
             ax2.set_title(f'Prediction Error Distribution (Mean: {np.mean(errors):.2f}%, Std: {np.std(errors):.2f}%)')
             ax2.grid(True, alpha=0.3)
+    
+    def _draw_daily_stats(self, axes, df):
+        """일별 최소/평균/최대 통계를 3개의 축(토양 수분, 온도, 습도)에 그림"""
+        # 일별 그룹화 (datetime64 날짜 키 사용, 원본 df에 컬럼을 추가하지 않음)
+        day_key = df['timestamp'].to_numpy().astype('datetime64[D]')
+        daily_stats = df.groupby(day_key)[['soil_moisture', 'temperature', 'humidity']].agg(
+            ['mean', 'min', 'max']
+        )
+        
+        dates = daily_stats.index
+        
+        # 1. 일별 토양 수분
+        ax1 = axes[0]
+        ax1.fill_between(dates, 
+                        daily_stats['soil_moisture']['min'],
+                        daily_stats['soil_moisture']['max'],
+                        alpha=0.3, color=COLORS['moisture'])
+        ax1.plot(dates, daily_stats['soil_moisture']['mean'],
+                color=COLORS['moisture'], linewidth=2, marker='o')
+        ax1.axhline(y=30, color=COLORS['threshold'], linestyle='--')
+        ax1.set_ylabel('Soil Moisture (%)')
+        ax1.set_title('Daily Soil Moisture (Min/Avg/Max)')
+        ax1.grid(True, alpha=0.3)
+        
+        # 2. 일별 온도
+        ax2 = axes[1]
+        ax2.fill_between(dates,
+                        daily_stats['temperature']['min'],
+                        daily_stats['temperature']['max'],
+                        alpha=0.3, color=COLORS['temperature'])
+        ax2.plot(dates, daily_stats['temperature']['mean'],
+                color=COLORS['temperature'], linewidth=2, marker='o')
+        ax2.set_ylabel('Temperature (C)')
+        ax2.set_title('Daily Temperature (Min/Avg/Max)')
+        ax2.grid(True, alpha=0.3)
+        
+        # 3. 일별 습도
+        ax3 = axes[2]
+        ax3.fill_between(dates,
+                        daily_stats['humidity']['min'],
+                        daily_stats['humidity']['max'],
+                        alpha=0.3, color=COLORS['humidity'])
+        ax3.plot(dates, daily_stats['humidity']['mean'],
+                color=COLORS['humidity'], linewidth=2, marker='o')
+        ax3.set_ylabel('Humidity (%)')
+        ax3.set_xlabel('Date')
+        ax3.set_title('Daily Humidity (Min/Avg/Max)')
+        ax3.grid(True, alpha=0.3)
+        
+        ax3.tick_params(axis='x', labelrotation=45)
+    
+    def plot_sensor_data(self, df, save_path='sensor_plot.png'):
+        """
+        센서 데이터 시각화 (3개 서브플롯)
+        
+        Args:
+            df: 센서 데이터 DataFrame
+            save_path: 저장 경로
+        """
+        fig, axes = plt.subplots(3, 1, figsize=self.figsize, sharex=True)
+        fig.suptitle('Smart Irrigation System - Sensor Data', fontsize=14, fontweight='bold')
+        
+        self._draw_sensor_data(axes, df)
         
         plt.tight_layout()
-        plt.savefig(save_path, dpi=150, bbox_inches='tight')
+        plt.savefig(save_path, dpi=PLOT_DPI, bbox_inches='tight')
+        print(f"[시각화] 센서 데이터 그래프 저장: {save_path}")
+        plt.close()
+    
+    def plot_prediction(self, df, predictor, save_path='prediction_plot.png'):
+        """
+        예측 결과 시각화
+        
+        Args:
+            df: 센서 데이터 DataFrame
+            predictor: SoilMoisturePredictor 인스턴스
+            save_path: 저장 경로
+        """
+        fig, axes = plt.subplots(2, 1, figsize=(14, 8))
+        fig.suptitle('AI Prediction Analysis', fontsize=14, fontweight='bold')
+        
+        self._draw_prediction(axes, df, predictor)
+        
+        plt.tight_layout()
+        plt.savefig(save_path, dpi=PLOT_DPI, bbox_inches='tight')
         print(f"[시각화] 예측 그래프 저장: {save_path}")
         plt.close()
     
@@ -176,67 +415,53 @@ class RealTimeVisualizer:
             df: 센서 데이터 DataFrame
             save_path: 저장 경로
         """
-        if df['timestamp'].dtype == 'object':
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # 일별 그룹화
-        df['date'] = df['timestamp'].dt.date
-        daily_stats = df.groupby('date').agg({
-            'soil_moisture': ['mean', 'min', 'max'],
-            'temperature': ['mean', 'min', 'max'],
-            'humidity': ['mean', 'min', 'max']
-        }).round(1)
-        
         fig, axes = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
         fig.suptitle('Daily Statistics', fontsize=14, fontweight='bold')
         
-        dates = daily_stats.index
+        self._draw_daily_stats(axes, df)
         
-        # 1. 일별 토양 수분
-        ax1 = axes[0]
-        ax1.fill_between(dates, 
-                        daily_stats['soil_moisture']['min'],
-                        daily_stats['soil_moisture']['max'],
-                        alpha=0.3, color=self.colors['moisture'])
-        ax1.plot(dates, daily_stats['soil_moisture']['mean'],
-                color=self.colors['moisture'], linewidth=2, marker='o')
-        ax1.axhline(y=30, color=self.colors['threshold'], linestyle='--')
-        ax1.set_ylabel('Soil Moisture (%)')
-        ax1.set_title('Daily Soil Moisture (Min/Avg/Max)')
-        ax1.grid(True, alpha=0.3)
-        
-        # 2. 일별 온도
-        ax2 = axes[1]
-        ax2.fill_between(dates,
-                        daily_stats['temperature']['min'],
-                        daily_stats['temperature']['max'],
-                        alpha=0.3, color=self.colors['temperature'])
-        ax2.plot(dates, daily_stats['temperature']['mean'],
-                color=self.colors['temperature'], linewidth=2, marker='o')
-        ax2.set_ylabel('Temperature (C)')
-        ax2.set_title('Daily Temperature (Min/Avg/Max)')
-        ax2.grid(True, alpha=0.3)
-        
-        # 3. 일별 습도
-        ax3 = axes[2]
-        ax3.fill_between(dates,
-                        daily_stats['humidity']['min'],
-                        daily_stats['humidity']['max'],
-                        alpha=0.3, color=self.colors['humidity'])
-        ax3.plot(dates, daily_stats['humidity']['mean'],
-                color=self.colors['humidity'], linewidth=2, marker='o')
-        ax3.set_ylabel('Humidity (%)')
-        ax3.set_xlabel('Date')
-        ax3.set_title('Daily Humidity (Min/Avg/Max)')
-        ax3.grid(True, alpha=0.3)
-        
-        plt.xticks(rotation=45)
         plt.tight_layout()
-        plt.savefig(save_path, dpi=150, bbox_inches='tight')
+        plt.savefig(save_path, dpi=PLOT_DPI, bbox_inches='tight')
         print(f"[시각화] 일별 통계 그래프 저장: {save_path}")
         plt.close()
     
-    def create_dashboard_html(self, df, predictor, output_path='dashboard.html'):
+    def _combined_figure(self, df, predictor):
+        """센서/예측/일별 통계 8개 그래프를 한 Figure에 그려서 반환"""
+        fig = plt.figure(figsize=(14, 22))
+        fig.suptitle('Smart Irrigation System - Analysis', fontsize=14, fontweight='bold')
+        gs = fig.add_gridspec(8, 1)
+        
+        # 센서 데이터(0~2), 일별 통계(5~7)는 각각 X축 공유
+        sensor_axes = [fig.add_subplot(gs[0])]
+        sensor_axes += [fig.add_subplot(gs[i], sharex=sensor_axes[0]) for i in (1, 2)]
+        pred_axes = [fig.add_subplot(gs[3]), fig.add_subplot(gs[4])]
+        daily_axes = [fig.add_subplot(gs[5])]
+        daily_axes += [fig.add_subplot(gs[i], sharex=daily_axes[0]) for i in (6, 7)]
+        for ax in sensor_axes[:2] + daily_axes[:2]:
+            ax.tick_params(labelbottom=False)
+        
+        self._draw_sensor_data(sensor_axes, df)
+        self._draw_prediction(pred_axes, df, predictor)
+        self._draw_daily_stats(daily_axes, df)
+        
+        fig.tight_layout(rect=(0, 0, 1, 0.985))  # 전체 제목 공간 확보
+        return fig
+    
+    def plot_combined(self, df, predictor, save_path='analysis.png'):
+        """
+        종합 분석 그래프를 한 장의 이미지로 저장 (Figure 생성/PNG 인코딩 1회)
+        
+        Args:
+            df: 센서 데이터 DataFrame
+            predictor: SoilMoisturePredictor 인스턴스
+            save_path: 저장 경로
+        """
+        fig = self._combined_figure(df, predictor)
+        fig.savefig(save_path, dpi=PLOT_DPI, bbox_inches='tight')
+        print(f"[시각화] 종합 분석 그래프 저장: {save_path}")
+        plt.close(fig)
+    
+    def create_dashboard_html(self, df, predictor, output_path='dashboard.html', embed_plots=False):
         """
         HTML 대시보드 생성 (발표용)
         
@@ -244,6 +469,7 @@ class RealTimeVisualizer:
             df: 센서 데이터 DataFrame
             predictor: SoilMoisturePredictor 인스턴스
             output_path: 출력 파일 경로
+            embed_plots: True면 종합 분석 그래프를 PNG(base64)로 HTML에 포함
         """
         # 최신 데이터
         latest = df.iloc[-1]
@@ -262,129 +488,25 @@ class RealTimeVisualizer:
             status = "OPTIMAL"
             status_color = "#27AE60"
         
-        html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Smart Irrigation Dashboard</title>
-    <meta charset="UTF-8">
-    <style>
-        body {{
-            font-family: 'Segoe UI', Arial, sans-serif;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
-            color: white;
-            margin: 0;
-            padding: 20px;
-        }}
-        .header {{
-            text-align: center;
-            padding: 20px;
-            background: rgba(255,255,255,0.1);
-            border-radius: 15px;
-            margin-bottom: 20px;
-        }}
-        .header h1 {{
-            margin: 0;
-            font-size: 2em;
-        }}
-        .header p {{
-            margin: 10px 0 0 0;
-            opacity: 0.8;
-        }}
-        .dashboard {{
-            display: grid;
-            grid-template-columns: repeat(4, 1fr);
-            gap: 20px;
-            margin-bottom: 20px;
-        }}
-        .card {{
-            background: rgba(255,255,255,0.1);
-            border-radius: 15px;
-            padding: 25px;
-            text-align: center;
-        }}
-        .card h3 {{
-            margin: 0 0 15px 0;
-            font-size: 0.9em;
-            opacity: 0.8;
-        }}
-        .card .value {{
-            font-size: 2.5em;
-            font-weight: bold;
-        }}
-        .card .unit {{
-            font-size: 0.8em;
-            opacity: 0.6;
-        }}
-        .status-card {{
-            grid-column: span 2;
-            background: {status_color};
-        }}
-        .status-card .value {{
-            font-size: 1.8em;
-        }}
-        .moisture {{ color: #3498DB; }}
-        .temp {{ color: #E74C3C; }}
-        .humid {{ color: #9B59B6; }}
-        .predict {{ color: #2ECC71; }}
-        .footer {{
-            text-align: center;
-            padding: 20px;
-            opacity: 0.6;
-            font-size: 0.9em;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>🌱 AI Smart Irrigation System</h1>
-        <p>Team: My Green Smart Farm | 2025 SCNU Hackathon</p>
-    </div>
-    
-    <div class="dashboard">
-        <div class="card">
-            <h3>SOIL MOISTURE</h3>
-            <div class="value moisture">{latest['soil_moisture']:.1f}</div>
-            <div class="unit">%</div>
-        </div>
-        <div class="card">
-            <h3>TEMPERATURE</h3>
-            <div class="value temp">{latest['temperature']:.1f}</div>
-            <div class="unit">°C</div>
-        </div>
-        <div class="card">
-            <h3>HUMIDITY</h3>
-            <div class="value humid">{latest['humidity']:.1f}</div>
-            <div class="unit">%</div>
-        </div>
-        <div class="card">
-            <h3>AI PREDICTION (1hr)</h3>
-            <div class="value predict">{prediction:.1f}</div>
-            <div class="unit">%</div>
-        </div>
-        <div class="card status-card">
-            <h3>SYSTEM STATUS</h3>
-            <div class="value">{status}</div>
-        </div>
-        <div class="card">
-            <h3>UPPER SENSOR</h3>
-            <div class="value moisture">{latest['soil_upper']:.1f}</div>
-            <div class="unit">%</div>
-        </div>
-        <div class="card">
-            <h3>LOWER SENSOR</h3>
-            <div class="value moisture">{latest['soil_lower']:.1f}</div>
-            <div class="unit">%</div>
-        </div>
-    </div>
-    
-    <div class="footer">
-        Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | 
-        Threshold: 30% | Watering Duration: 180s
-    </div>
-</body>
-</html>
-        """
+        values = {col: f"{latest[col]:.1f}" for col in
+                  ('soil_moisture', 'temperature', 'humidity', 'soil_upper', 'soil_lower')}
+        # 그래프는 파일로 저장하지 않고 메모리에서 바로 인코딩
+        plots = ''
+        if embed_plots:
+            fig = self._combined_figure(df, predictor)
+            buf = io.BytesIO()
+            fig.savefig(buf, format='png', dpi=PLOT_DPI, bbox_inches='tight')
+            plt.close(fig)
+            plots = f'<img src="data:image/png;base64,{base64.b64encode(buf.getvalue()).decode()}">'
+        
+        html_content = _DASHBOARD_TPL.substitute(
+            values,
+            plots=plots,
+            prediction=f"{prediction:.1f}",
+            status=status,
+            status_color=status_color,
+            updated=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
         
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(html_content)
@@ -408,6 +530,6 @@ if __name__ == "__main__":
     # 시각화
     visualizer = RealTimeVisualizer()
     visualizer.plot_analysis(df, predictor)
-    visualizer.create_dashboard_html(df, predictor)
+    visualizer.create_dashboard_html(df, predictor, embed_plots=True)
     
     print("\n모든 시각화 완료!")